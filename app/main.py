@@ -1,8 +1,10 @@
 # app/main.py
 
-from fastapi import FastAPI
-from app.routes import evaluate_data, metadata
+from fastapi import FastAPI, Request
+from app.routes import coverage, evaluate_data, metadata, scenes
+from app.utils.profiling import PROFILING_DIR, PROFILING_ENABLED, RequestProfile, dump_after_body, wants_profile
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 # Initialize the FastAPI application with metadata for documentation
 app = FastAPI(
@@ -19,12 +21,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Catalog-Generation"],
 )
 
+# The profiling middleware is only installed when enabled, so regular
+# deployments do not pay for it on every request.
+if PROFILING_ENABLED:
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        """
+        Profiles a single request when it carries the profiling header.
+
+        Writes a collapsed-stack profile and a per-phase timing breakdown to
+        PROFILING_DIR and returns the profile id in the `X-Profile-Id` header.
+        """
+        if not wants_profile(request.headers):
+            return await call_next(request)
+
+        profile = RequestProfile(f"{request.method} {request.url.path}")
+        profile.start()
+        try:
+            response = await call_next(request)
+        except Exception:
+            profile.stop()
+            await run_in_threadpool(profile.dump, PROFILING_DIR, 500)
+            raise
+        finally:
+            profile.deactivate()
+
+        # call_next returns as soon as the headers are ready; the profile is
+        # only written once the body has been sent
+        response.headers["X-Profile-Id"] = profile.id
+        response.body_iterator = dump_after_body(
+            profile, response.body_iterator, PROFILING_DIR, response.status_code
+        )
+        return response
 
 # Include routers for different endpoints with appropriate tags for documentation
 app.include_router(evaluate_data.router, tags=["Evaluate Data"])
 app.include_router(metadata.router, tags=["Metadata"])
+app.include_router(scenes.router, tags=["Scenes"])
+app.include_router(coverage.router, tags=["Coverage"])
 
 @app.get("/")
 def read_root():
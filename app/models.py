@@ -1,8 +1,9 @@
 # app/models.py
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
+from datetime import date
 
 class UserRole(str, Enum):
     """
@@ -176,4 +177,85 @@ class CalculateRequest(BaseModel):
         ..., 
         example=-118.2437, 
         description="Longitude of the target location."
-    )
\ No newline at end of file
+    )
+
+class FieldGeometry(BaseModel):
+    """
+    Schema for a single field (parcel) submitted for coverage analysis.
+    """
+    id: Optional[str] = Field(
+        None, 
+        example="parcel-17", 
+        description="Client identifier of the field, echoed back in the response."
+    )
+    geometry: Dict[str, Any] = Field(
+        ..., 
+        example={
+            "type": "Polygon",
+            "coordinates": [[[-70.5, 0.2], [-70.4, 0.2], [-70.4, 0.3], [-70.5, 0.3], [-70.5, 0.2]]]
+        }, 
+        description="GeoJSON Polygon or MultiPolygon of the field, in longitude/latitude."
+    )
+
+class CoverageRequest(BaseModel):
+    """
+    Schema for the request payload to analyze the scene coverage of fields.
+    """
+    parcels: List[FieldGeometry] = Field(
+        ..., 
+        min_length=1, 
+        description="Fields to analyze; all of them are processed in one pass."
+    )
+    start_date: Optional[date] = Field(
+        None, 
+        example="2024-09-01", 
+        description="Only consider scenes acquired on or after this date."
+    )
+    end_date: Optional[date] = Field(
+        None, 
+        example="2024-10-31", 
+        description="Only consider scenes acquired on or before this date."
+    )
+    max_cloud_cover: Optional[float] = Field(
+        None, 
+        ge=0, 
+        le=100, 
+        example=20.0, 
+        description="Only consider scenes with at most this percentage of cloud cover."
+    )
+
+class FieldCoverage(BaseModel):
+    """
+    Schema for the scene coverage of a single field.
+    """
+    id: Optional[str] = Field(
+        None, 
+        example="parcel-17", 
+        description="Client identifier of the field."
+    )
+    covered_fraction: float = Field(
+        ..., 
+        example=0.87, 
+        description="Fraction of the field area covered by at least one scene."
+    )
+    best_scene_id: Optional[str] = Field(
+        None, 
+        example="LC09_L2SP_005060_20240928_20241001_02_T2", 
+        description="Scene covering the largest part of the field, ties broken by lower cloud cover."
+    )
+    best_scene_fraction: float = Field(
+        ..., 
+        example=0.75, 
+        description="Fraction of the field area covered by the best scene."
+    )
+    scene_count: int = Field(
+        ..., 
+        example=2, 
+        description="Number of scenes intersecting the field."
+    )
+
+class CoverageResponse(BaseModel):
+    """
+    Schema for the response payload of the coverage analysis.
+    """
+    parcels: List[FieldCoverage]
@@ -0,0 +1,112 @@
+# app/routes/coverage.py
+
+from fastapi import APIRouter, HTTPException
+from app.models import CoverageRequest, CoverageResponse, FieldCoverage
+from app.utils.profiling import ProfiledRoute
+from app.utils.scene_catalog import get_catalog
+from shapely.geometry import shape
+import numpy as np
+import shapely
+import logging
+
+router = APIRouter(route_class=ProfiledRoute)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _parse_fields(request: CoverageRequest) -> np.ndarray:
+    """
+    Converts the GeoJSON geometries of the request into a shapely array.
+
+    Raises:
+        HTTPException: If a geometry is not a non-empty Polygon or MultiPolygon,
+            or has no area once repaired.
+    """
+    fields = []
+    for number, parcel in enumerate(request.parcels):
+        label = parcel.id if parcel.id is not None else f"#{number}"
+        try:
+            geometry = shape(parcel.geometry)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid geometry for field {label}: {e}")
+        if geometry.geom_type not in ('Polygon', 'MultiPolygon') or geometry.is_empty:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Field {label} must be a non-empty Polygon or MultiPolygon."
+            )
+        fields.append(geometry)
+
+    # Repair self-intersections so that intersection areas are well defined
+    fields = shapely.make_valid(np.array(fields, dtype=object))
+
+    # Repairing a polygon with spikes or collapsed parts yields a
+    # GeometryCollection mixing polygons with lines or points: keep its
+    # polygonal parts only
+    mixed = np.flatnonzero(~np.isin(shapely.get_type_id(fields), (3, 6)))  # Polygon, MultiPolygon
+    for number in mixed:
+        parts = shapely.get_parts(shapely.get_parts(fields[number]))
+        polygons = parts[shapely.get_type_id(parts) == 3]
+        fields[number] = shapely.multipolygons(polygons) if len(polygons) > 1 \
+            else polygons[0] if len(polygons) else shapely.Polygon()
+
+    # Degenerate rings (e.g. collinear points) repair to lines or empty
+    # geometries with no area to compute a covered fraction of
+    invalid = np.flatnonzero(shapely.area(fields) <= 0)
+    if len(invalid):
+        number = int(invalid[0])
+        parcel = request.parcels[number]
+        label = parcel.id if parcel.id is not None else f"#{number}"
+        raise HTTPException(
+            status_code=400,
+            detail=f"Field {label} has no area once repaired; it must be a non-degenerate polygon."
+        )
+    return fields
+
+@router.post("/coverage", response_model=CoverageResponse)
+def analyze_coverage(request: CoverageRequest):
+    """
+    Computes, for each field polygon, the fraction covered by the available
+    scenes and the scene that covers it best.
+
+    Args:
+        request (CoverageRequest): Field geometries and optional scene filters.
+
+    Returns:
+        CoverageResponse: The coverage of each field, in request order.
+
+    Raises:
+        HTTPException: If a geometry is invalid or the analysis fails.
+    """
+    fields = _parse_fields(request)
+
+    try:
+        catalog = get_catalog()
+
+        allowed = None
+        if request.start_date or request.end_date or request.max_cloud_cover is not None:
+            allowed = catalog.filter(
+                np.arange(len(catalog)),
+                request.start_date,
+                request.end_date,
+                request.max_cloud_cover
+            )
+
+        covered, best_position, best_fraction, scene_count = catalog.coverage(fields, allowed)
+        logger.info(f"Computed coverage for {len(fields)} fields")
+
+        return CoverageResponse(parcels=[
+            FieldCoverage(
+                id=parcel.id,
+                covered_fraction=round(float(covered[i]), 4),
+                best_scene_id=catalog.scene_ids[best_position[i]] if best_position[i] >= 0 else None,
+                best_scene_fraction=round(float(best_fraction[i]), 4),
+                scene_count=int(scene_count[i])
+            )
+            for i, parcel in enumerate(request.parcels)
+        ])
+
+    except Exception as e:
+        # Log the error and return a 500 Internal Server Error
+        logger.error(f"Error during coverage analysis: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
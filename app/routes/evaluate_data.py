@@ -2,11 +2,12 @@
 
 from fastapi import APIRouter, HTTPException
 from app.models import EvaluateDataRequest, EvaluateDataResponse
-from app.routes.metadata import get_metadata  # Import the get_metadata function
+from app.routes.metadata import find_metadata  # Import the find_metadata function
 from app.utils.openai_client import get_openai_response
+from app.utils.profiling import ProfiledRoute, profile_phase
 from typing import List, Dict
 
-router = APIRouter()  # Define the router
+router = APIRouter(route_class=ProfiledRoute)  # Define the router
 
 @router.post("/evaluate-data", response_model=EvaluateDataResponse)
 def evaluate_data(request: EvaluateDataRequest):
@@ -24,7 +25,7 @@ def evaluate_data(request: EvaluateDataRequest):
     """
     try:
         # Fetch real metadata using the provided latitude and longitude
-        metadata = get_metadata(latitude=request.latitude, longitude=request.longitude)
+        metadata = find_metadata(latitude=request.latitude, longitude=request.longitude)
         
         # Format metadata into a structured string for the prompt
         metadata_info = (
@@ -61,7 +62,8 @@ def evaluate_data(request: EvaluateDataRequest):
         ]
         
         # Obtain the AI-generated response from OpenAI
-        ai_response = get_openai_response(messages)
+        with profile_phase("llm"):
+            ai_response = get_openai_response(messages)
         
         # Return the response encapsulated in the EvaluateDataResponse model
         return EvaluateDataResponse(user_friendly_response=ai_response)
@@ -1,124 +1,50 @@
 # app/routes/metadata.py
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from app.models import MetadataResponse
+from app.utils.http_cache import cache_headers, match_etag, modified_since, not_modified, query_digest
+from app.utils.profiling import ProfiledRoute
+from app.utils.scene_catalog import SceneCatalog, get_catalog
 import os
-import json
-from shapely.geometry import Polygon, Point
 import logging
-import math
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
-# Path to the data directory
-DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+# Seconds clients and CDNs may reuse a metadata response without revalidating it
+METADATA_CACHE_MAX_AGE = int(os.getenv("METADATA_CACHE_MAX_AGE", "300"))
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@router.get("/metadata", response_model=MetadataResponse)
-def get_metadata(
-    latitude: float = Query(
-        ..., 
-        example=34.0522, 
-        description="Latitude of the target location."
-    ),
-    longitude: float = Query(
-        ..., 
-        example=-118.2437, 
-        description="Longitude of the target location."
-    )
-):
+def find_metadata(latitude: float, longitude: float, catalog: SceneCatalog = None) -> MetadataResponse:
     """
     Retrieves metadata for the closest Landsat satellite image based on latitude and longitude.
 
     Args:
         latitude (float): Latitude of the target location.
         longitude (float): Longitude of the target location.
+        catalog (SceneCatalog): Catalog to search, the current one by default.
 
     Returns:
         MetadataResponse: The metadata associated with the closest satellite image.
 
     Raises:
-        HTTPException: If there is an error fetching or processing metadata.
+        HTTPException: If no metadata is available or it cannot be processed.
     """
     try:
         # Log the start of the metadata search
         logger.info(f"Looking for metadata for location: ({latitude}, {longitude})")
 
-        user_point = Point(longitude, latitude)
-
-        closest_metadata = None
-        min_distance = float('inf')
-
-        # Iterate over all JSON files in the data directory
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith('.json'):
-                filepath = os.path.join(DATA_DIR, filename)
-                
-                # Log which file is being processed
-                logger.info(f"Processing file: {filepath}")
-                
-                with open(filepath, 'r') as f:
-                    try:
-                        data = json.load(f)
-                    except json.JSONDecodeError as json_err:
-                        logger.error(f"Error decoding JSON file {filename}: {json_err}")
-                        continue
-
-                # Extract corner coordinates
-                corners = data.get('PROJECTION_ATTRIBUTES', {})
-                if not corners:
-                    logger.info(f"No projection attributes found in file: {filename}")
-                    continue  # Skip if no projection attributes
-
-                ul_lat = corners.get('CORNER_UL_LAT_PRODUCT')
-                ul_lon = corners.get('CORNER_UL_LON_PRODUCT')
-                ur_lat = corners.get('CORNER_UR_LAT_PRODUCT')
-                ur_lon = corners.get('CORNER_UR_LON_PRODUCT')
-                ll_lat = corners.get('CORNER_LL_LAT_PRODUCT')
-                ll_lon = corners.get('CORNER_LL_LON_PRODUCT')
-                lr_lat = corners.get('CORNER_LR_LAT_PRODUCT')
-                lr_lon = corners.get('CORNER_LR_LON_PRODUCT')
-
-                if None in [ul_lat, ul_lon, ur_lat, ur_lon, ll_lat, ll_lon, lr_lat, lr_lon]:
-                    logger.warning(f"Missing corner coordinates in file: {filename}")
-                    continue  # Skip if any coordinate is missing
-
-                # Create a polygon from corner coordinates
-                polygon = Polygon([
-                    (ul_lon, ul_lat),
-                    (ur_lon, ur_lat),
-                    (lr_lon, lr_lat),
-                    (ll_lon, ll_lat)
-                ])
-
-                # Calculate centroid of the polygon
-                centroid = polygon.centroid
-
-                # Calculate the great-circle distance between user location and centroid
-                def haversine(lon1, lat1, lon2, lat2):
-                    R = 6371  # Earth radius in kilometers
-                    phi1 = math.radians(lat1)
-                    phi2 = math.radians(lat2)
-                    delta_phi = math.radians(lat2 - lat1)
-                    delta_lambda = math.radians(lon2 - lon1)
-                    a = math.sin(delta_phi / 2) ** 2 + \
-                        math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
-                    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-                    return R * c  # Distance in kilometers
-
-                distance_km = haversine(
-                    user_point.x, user_point.y, centroid.x, centroid.y)
-
-                logger.info(f"Distance to {filename}: {distance_km:.2f} km")
-
-                if distance_km < min_distance:
-                    min_distance = distance_km
-                    closest_metadata = data
-
-        if closest_metadata is not None:
+        if catalog is None:
+            catalog = get_catalog()
+
+        # Find the scene whose footprint centroid is closest to the user location
+        position, min_distance = catalog.closest(longitude, latitude)
+
+        if position is not None:
+            closest_metadata = catalog.read_scene(position)
+
             # Extract metadata and return it
             image_attributes = closest_metadata.get('IMAGE_ATTRIBUTES', {})
             projection_attributes = closest_metadata.get('PROJECTION_ATTRIBUTES', {})
@@ -141,7 +67,7 @@ def get_metadata(
                 ground_sampling_distance=projection_attributes.get('GRID_CELL_SIZE_REFLECTIVE'),
                 projection=projection_attributes.get('MAP_PROJECTION'),
                 processing_level=level2_processing_record.get('PROCESSING_LEVEL', level1_processing_record.get('PROCESSING_LEVEL', 'Unknown')),
-                scene_id=level2_processing_record.get('LANDSAT_PRODUCT_ID', level1_processing_record.get('LANDSAT_PRODUCT_ID', 'Unknown')),
+                scene_id=catalog.scene_ids[position],
                 orbit_number=None,  # Not available in the JSON
                 sensor_type=image_attributes.get('SENSOR_ID', 'Unknown'),
                 cloud_mask=None,  # Not available in the JSON
@@ -154,7 +80,71 @@ def get_metadata(
             logger.error("No metadata found for any location.")
             raise HTTPException(status_code=404, detail="No metadata available.")
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Log the error and return a 500 Internal Server Error
         logger.error(f"Error during metadata retrieval: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def _metadata_etag(catalog: SceneCatalog, scene_id: str, digest: str) -> str:
+    return f"{catalog.generation}-{scene_id}-{digest}"
+
+@router.get("/metadata", response_model=MetadataResponse)
+def get_metadata(
+    request: Request,
+    response: Response,
+    latitude: float = Query(
+        ...,
+        example=34.0522,
+        description="Latitude of the target location."
+    ),
+    longitude: float = Query(
+        ...,
+        example=-118.2437,
+        description="Longitude of the target location."
+    )
+):
+    """
+    Retrieves metadata for the closest Landsat satellite image based on latitude and longitude.
+
+    The response carries an ETag built from the catalog generation, the chosen
+    scene ID and the query. The chosen scene only changes with the catalog, so
+    a matching If-None-Match is answered with 304 Not Modified before any
+    lookup. `If-None-Match: *` and If-Modified-Since need the chosen scene to
+    send the ETag, and get a 304 only when the catalog is not empty.
+
+    Args:
+        latitude (float): Latitude of the target location.
+        longitude (float): Longitude of the target location.
+
+    Returns:
+        MetadataResponse: The metadata associated with the closest satellite image.
+
+    Raises:
+        HTTPException: If there is an error fetching or processing metadata.
+    """
+    catalog = get_catalog()
+    digest = query_digest(latitude, longitude)
+
+    etag = match_etag(
+        request,
+        lambda tag: tag.startswith(f"{catalog.generation}-") and tag.endswith(f"-{digest}")
+    )
+    if etag is not None or not modified_since(request, catalog.last_modified):
+        # A wildcard or If-Modified-Since match does not carry the validator:
+        # find the chosen scene (without reading its file) to send it, and
+        # only answer 304 if a representation exists at all
+        if etag is None or etag == "*":
+            position, _ = catalog.closest(longitude, latitude)
+            etag = None if position is None else _metadata_etag(catalog, catalog.scene_ids[position], digest)
+        if etag is not None:
+            return not_modified(cache_headers(etag, catalog.last_modified, METADATA_CACHE_MAX_AGE))
+
+    metadata = find_metadata(latitude, longitude, catalog)
+    response.headers.update(cache_headers(
+        _metadata_etag(catalog, metadata.scene_id, digest),
+        catalog.last_modified,
+        METADATA_CACHE_MAX_AGE
+    ))
+    return metadata
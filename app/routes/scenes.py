@@ -0,0 +1,179 @@
+# app/routes/scenes.py
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.utils.profiling import ProfiledRoute, profile_iterator
+from app.utils.scene_catalog import get_catalog
+from datetime import date
+from typing import Optional
+import json
+import math
+import logging
+
+router = APIRouter(route_class=ProfiledRoute)
+
+# Number of NDJSON rows written to the response per chunk
+STREAM_CHUNK_SIZE = 256
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _parse_bbox(bbox: str):
+    """
+    Parses a `min_lon,min_lat,max_lon,max_lat` bounding box.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(','))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'min_lon,min_lat,max_lon,max_lat'.")
+    if not all(math.isfinite(value) for value in (min_lon, min_lat, max_lon, max_lat)):
+        raise HTTPException(status_code=400, detail="bbox coordinates must be finite numbers.")
+    if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180 and -90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+        raise HTTPException(
+            status_code=400,
+            detail="bbox longitudes must be within [-180, 180] and latitudes within [-90, 90]."
+        )
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox minimums must not exceed its maximums.")
+    return min_lon, min_lat, max_lon, max_lat
+
+def _stream_rows(catalog, positions, distances):
+    """
+    Serializes the selected scenes as NDJSON, one chunk of rows at a time.
+    """
+    for start in range(0, len(positions), STREAM_CHUNK_SIZE):
+        lines = []
+        for offset in range(start, min(start + STREAM_CHUNK_SIZE, len(positions))):
+            scene = catalog.scenes[positions[offset]]
+            row = {
+                "scene_id": scene['scene_id'],
+                "satellite": scene['satellite'],
+                "acquisition_date": scene['acquisition_date'],
+                "acquisition_time": scene['acquisition_time'],
+                "wrs_path": scene['wrs_path'],
+                "wrs_row": scene['wrs_row'],
+                "cloud_coverage": scene['cloud_coverage'],
+                "footprint": {
+                    "type": "Polygon",
+                    "coordinates": [scene['footprint'] + scene['footprint'][:1]],
+                },
+            }
+            if distances is not None:
+                row["distance_km"] = round(float(distances[offset]), 2)
+            lines.append(json.dumps(row))
+        yield "\n".join(lines) + "\n"
+
+@router.get("/scenes/search")
+def search_scenes(
+    bbox: Optional[str] = Query(
+        None,
+        example="-75.0,0.0,-69.0,7.0",
+        description="Bounding box as 'min_lon,min_lat,max_lon,max_lat'."
+    ),
+    latitude: Optional[float] = Query(
+        None,
+        ge=-90,
+        le=90,
+        example=6.0,
+        description="Latitude of the center of a radius search."
+    ),
+    longitude: Optional[float] = Query(
+        None,
+        ge=-180,
+        le=180,
+        example=-74.0,
+        description="Longitude of the center of a radius search."
+    ),
+    radius_km: Optional[float] = Query(
+        None,
+        gt=0,
+        example=500.0,
+        description="Radius in kilometers around the given latitude and longitude."
+    ),
+    start_date: Optional[date] = Query(
+        None,
+        example="2024-09-01",
+        description="Only return scenes acquired on or after this date."
+    ),
+    end_date: Optional[date] = Query(
+        None,
+        example="2024-10-31",
+        description="Only return scenes acquired on or before this date."
+    ),
+    max_cloud_cover: Optional[float] = Query(
+        None,
+        ge=0,
+        le=100,
+        example=20.0,
+        description="Only return scenes with at most this percentage of cloud cover."
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Value of the X-Next-Cursor header of the previous page."
+    ),
+    limit: int = Query(
+        1000,
+        ge=1,
+        le=10000,
+        description="Maximum number of scenes returned in this page."
+    )
+):
+    """
+    Streams every scene whose footprint intersects a bounding box, or lies
+    within a radius of a point, as newline-delimited JSON.
+
+    Results are ordered by scene ID. When more results remain, the
+    `X-Next-Cursor` response header holds the cursor of the next page.
+
+    Returns:
+        StreamingResponse: One JSON object per line (application/x-ndjson).
+
+    Raises:
+        HTTPException: If the search area is invalid or the search fails.
+    """
+    radius_search = (latitude, longitude, radius_km) != (None, None, None)
+    if (bbox is None) == (not radius_search):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide either bbox or latitude, longitude and radius_km."
+        )
+    if radius_search and None in (latitude, longitude, radius_km):
+        raise HTTPException(
+            status_code=400,
+            detail="A radius search needs latitude, longitude and radius_km."
+        )
+    area = _parse_bbox(bbox) if bbox is not None else None
+
+    try:
+        catalog = get_catalog()
+
+        positions, distances = catalog.search_page(
+            start=catalog.position_after(cursor) if cursor is not None else 0,
+            limit=limit,
+            bbox=area,
+            point=(longitude, latitude) if radius_search else None,
+            radius_km=radius_km,
+            start_date=start_date,
+            end_date=end_date,
+            max_cloud_cover=max_cloud_cover
+        )
+
+        headers = {"X-Catalog-Generation": catalog.generation}
+        if len(positions) > limit:
+            positions = positions[:limit]
+            headers["X-Next-Cursor"] = catalog.scene_ids[positions[-1]]
+        if distances is not None:
+            distances = distances[:len(positions)]
+
+        logger.info(f"Scene search matched {len(positions)} scenes in this page")
+        return StreamingResponse(
+            profile_iterator(_stream_rows(catalog, positions, distances)),
+            media_type="application/x-ndjson",
+            headers=headers
+        )
+
+    except Exception as e:
+        # Log the error and return a 500 Internal Server Error
+        logger.error(f"Error during scene search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
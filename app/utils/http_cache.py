@@ -0,0 +1,74 @@
+# app/utils/http_cache.py
+
+import hashlib
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+from fastapi import Request, Response
+
+def query_digest(*values) -> str:
+    """
+    Short, deterministic digest of the query parameters a response depends on.
+    """
+    key = ",".join(repr(value) for value in values)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+def _if_none_match(request: Request) -> List[str]:
+    # Entity tags are compared weakly, so the W/ prefix is dropped
+    header = request.headers.get("if-none-match", "")
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag.strip('"'))
+    return tags
+
+def match_etag(request: Request, accepts: Callable[[str], bool]) -> Optional[str]:
+    """
+    Returns the first entity tag of the If-None-Match header accepted by `accepts`.
+
+    This allows endpoints to validate a tag from cheap inputs (catalog
+    generation, query digest) before doing any lookup.
+    """
+    for tag in _if_none_match(request):
+        if tag == "*" or accepts(tag):
+            return tag
+    return None
+
+def modified_since(request: Request, last_modified: datetime.datetime) -> bool:
+    """
+    Evaluates If-Modified-Since; it is ignored when If-None-Match is present.
+    """
+    header = request.headers.get("if-modified-since")
+    if header is None or "if-none-match" in request.headers:
+        return True
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    # HTTP dates have a resolution of one second
+    return last_modified.replace(microsecond=0) > since
+
+def cache_headers(
+    etag: str,
+    last_modified: datetime.datetime,
+    max_age: int
+) -> Dict[str, str]:
+    """
+    Builds the validator and freshness headers shared by 200 and 304 responses.
+    """
+    return {
+        "Cache-Control": f"public, max-age={max(int(max_age), 0)}",
+        "ETag": f'"{etag}"',
+        "Last-Modified": format_datetime(last_modified.astimezone(datetime.timezone.utc), usegmt=True),
+    }
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """
+    Returns an empty 304 Not Modified response.
+    """
+    return Response(status_code=304, headers=headers)
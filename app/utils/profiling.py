@@ -0,0 +1,264 @@
+# app/utils/profiling.py
+
+import os
+import sys
+import asyncio
+import json
+import time
+import uuid
+import logging
+import functools
+import threading
+import contextvars
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+# Load environment variables from the .env file
+load_dotenv()
+
+def _is_truthy(value) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+# Profiling is opt-in twice: the server flag installs the middleware and the
+# request header selects the individual requests that get profiled.
+PROFILING_ENABLED = _is_truthy(os.getenv("PROFILING_ENABLED", "false"))
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile-Request")
+PROFILING_DIR = os.getenv(
+    "PROFILING_DIR",
+    os.path.join(os.path.dirname(__file__), '..', '..', 'profiles')
+)
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "1"))
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Profile of the request being handled in the current context, if any
+_current_profile = contextvars.ContextVar("current_profile", default=None)
+
+class RequestProfile:
+    """
+    Collects stack samples and per-phase timings for a single profiled request.
+
+    A background thread samples the stacks of the threads currently working
+    on behalf of this request: the threadpool thread running the endpoint,
+    threads inside a profiling phase and threads producing a streamed body.
+    Threads are only sampled while attached, so other requests served by the
+    same threads do not leak into the profile.
+    """
+
+    def __init__(self, label: str, interval_ms: float = PROFILING_INTERVAL_MS):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.interval = max(interval_ms, 0.1) / 1000
+        self.stacks = Counter()
+        self.phases = defaultdict(lambda: {"calls": 0, "seconds": 0.0})
+        self.samples = 0
+        self.elapsed = 0.0
+        self._threads = Counter()  # thread ident -> attach depth
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._sample, name=f"profiler-{self.id}", daemon=True
+        )
+        self._started_at = None
+        self._token = None
+
+    def start(self):
+        """
+        Activates the profile for the current context and starts sampling.
+        """
+        self._token = _current_profile.set(self)
+        self._started_at = time.perf_counter()
+        self._sampler.start()
+
+    def deactivate(self):
+        """
+        Deactivates the profile for the current context.
+
+        Work already scheduled for the request (such as a streamed body)
+        keeps its copy of the context and is still profiled.
+        """
+        _current_profile.reset(self._token)
+
+    def stop(self):
+        """
+        Stops sampling; called once the response body has been sent.
+        """
+        self.elapsed = time.perf_counter() - self._started_at
+        self._stop.set()
+        self._sampler.join()
+
+    @contextmanager
+    def attached(self):
+        """
+        Samples the calling thread for as long as the block runs.
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    def record(self, phase: str, seconds: float):
+        """
+        Adds the duration of one pass through a phase.
+        """
+        with self._lock:
+            entry = self.phases[phase]
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = tuple(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def dump(self, directory: str, status_code: int) -> str:
+        """
+        Writes the collapsed stacks and the phase breakdown to `directory`.
+
+        The `.collapsed` file can be opened directly in speedscope or fed to
+        flamegraph.pl; the `.json` file holds the per-phase timings.
+
+        Returns:
+            str: The common path prefix of the two files written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        prefix = os.path.join(
+            directory, f"{time.strftime('%Y%m%dT%H%M%S')}-{self.id}"
+        )
+
+        with open(f"{prefix}.collapsed", 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        summary = {
+            "id": self.id,
+            "request": self.label,
+            "status_code": status_code,
+            "total_ms": round(self.elapsed * 1000, 3),
+            "sample_interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "phases": {
+                name: {"calls": entry["calls"], "total_ms": round(entry["seconds"] * 1000, 3)}
+                for name, entry in self.phases.items()
+            },
+        }
+        with open(f"{prefix}.json", 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(f"Wrote request profile for {self.label} to {prefix}.*")
+        return prefix
+
+@contextmanager
+def profile_phase(name: str):
+    """
+    Times a named phase (e.g. "json_parse") of the request being profiled.
+
+    Outside of a profiled request this only costs a context variable lookup.
+
+    Args:
+        name (str): Name of the phase in the timing breakdown.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        with profile.attached():
+            yield
+    finally:
+        profile.record(name, time.perf_counter() - start)
+
+def _profiled_endpoint(endpoint):
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        with profile.attached():
+            return endpoint(*args, **kwargs)
+    wrapper.profiled = True
+    return wrapper
+
+class ProfiledRoute(APIRoute):
+    """
+    Route class that samples the threadpool thread running a sync endpoint
+    for the whole duration of a profiled request.
+
+    Endpoints are left untouched when profiling is disabled.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router re-creates routes from already wrapped endpoints
+        if PROFILING_ENABLED and not asyncio.iscoroutinefunction(endpoint) \
+                and not getattr(endpoint, 'profiled', False):
+            endpoint = _profiled_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+class _ProfiledIterator:
+    def __init__(self, profile, iterator):
+        self._profile = profile
+        self._iterator = iterator
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._profile.attached():
+            return next(self._iterator)
+
+def profile_iterator(iterable):
+    """
+    Wraps the sync iterator of a streamed response so that the threads
+    producing its chunks are sampled as part of the profiled request.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return iterable
+    return _ProfiledIterator(profile, iter(iterable))
+
+async def dump_after_body(profile: RequestProfile, body_iterator, directory: str, status_code: int):
+    """
+    Relays a response body, then stops the profile and writes it out once
+    the last chunk has been sent.
+    """
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        profile.stop()
+        await run_in_threadpool(profile.dump, directory, status_code)
+
+def wants_profile(headers) -> bool:
+    """
+    Checks whether a request asked to be profiled through the profiling header.
+    """
+    return _is_truthy(headers.get(PROFILING_HEADER, ""))
@@ -0,0 +1,417 @@
+# app/utils/scene_catalog.py
+
+import os
+import json
+import math
+import hashlib
+import logging
+import datetime
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from app.utils.profiling import profile_phase
+
+# Path to the data directory
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# Earth radius in kilometers
+EARTH_RADIUS_KM = 6371
+
+# Length of one degree of a great circle in kilometers
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Seconds between checks of the data directory for added, removed or rewritten scenes
+CATALOG_REFRESH_SECONDS = float(os.getenv("CATALOG_REFRESH_SECONDS", "5"))
+
+# Number of consecutive catalog positions indexed by each block tree; a
+# search page only queries the blocks it needs to fill itself
+INDEX_BLOCK_SIZE = 4096
+
+# Corner order used to build the footprint polygons
+CORNERS = ('UL', 'UR', 'LR', 'LL')
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    """
+    Great-circle distance in kilometers; accepts scalars or numpy arrays.
+    """
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    delta_phi = np.radians(np.subtract(lat2, lat1))
+    delta_lambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(delta_phi / 2) ** 2 + \
+        np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def _radius_boxes(longitude: float, latitude: float, radius_km: float) -> List[tuple]:
+    """
+    Longitude/latitude boxes enclosing the spherical cap of `radius_km`
+    around the point, split in two where the cap crosses the antimeridian.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat = latitude - delta_lat
+    max_lat = latitude + delta_lat
+
+    # A cap reaching a pole covers every longitude near it
+    if min_lat <= -90 or max_lat >= 90:
+        return [(-180.0, max(min_lat, -90.0), 180.0, min(max_lat, 90.0))]
+
+    # Widest longitude span of the cap, reached north or south of its center
+    delta_lon = math.degrees(math.asin(
+        math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))
+    ))
+    min_lon = longitude - delta_lon
+    max_lon = longitude + delta_lon
+    if min_lon < -180:
+        return [(-180.0, min_lat, max_lon, max_lat), (min_lon + 360, min_lat, 180.0, max_lat)]
+    if max_lon > 180:
+        return [(min_lon, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lon - 360, max_lat)]
+    return [(min_lon, min_lat, max_lon, max_lat)]
+
+def _scene_summary(filename: str, data: Dict) -> Optional[Dict]:
+    """
+    Extracts the fields indexed by the catalog from a scene metadata file.
+
+    Returns None when the file has no usable footprint.
+    """
+    # USGS MTL JSON files wrap every group in a top-level object
+    data = data.get('LANDSAT_METADATA_FILE', data)
+
+    projection_attributes = data.get('PROJECTION_ATTRIBUTES', {})
+    if not projection_attributes:
+        logger.info(f"No projection attributes found in file: {filename}")
+        return None
+
+    footprint = []
+    for corner in CORNERS:
+        lon = projection_attributes.get(f'CORNER_{corner}_LON_PRODUCT')
+        lat = projection_attributes.get(f'CORNER_{corner}_LAT_PRODUCT')
+        if lon is None or lat is None:
+            logger.warning(f"Missing corner coordinates in file: {filename}")
+            return None
+        footprint.append((float(lon), float(lat)))
+
+    image_attributes = data.get('IMAGE_ATTRIBUTES', {})
+    level1_processing_record = data.get('LEVEL1_PROCESSING_RECORD', {})
+    level2_processing_record = data.get('LEVEL2_PROCESSING_RECORD', {})
+    scene_id = level2_processing_record.get(
+        'LANDSAT_PRODUCT_ID',
+        level1_processing_record.get('LANDSAT_PRODUCT_ID', os.path.splitext(filename)[0])
+    )
+
+    return {
+        'scene_id': scene_id,
+        'filename': filename,
+        'satellite': image_attributes.get('SPACECRAFT_ID', 'Unknown'),
+        'acquisition_date': image_attributes.get('DATE_ACQUIRED'),
+        'acquisition_time': image_attributes.get('SCENE_CENTER_TIME'),
+        'wrs_path': image_attributes.get('WRS_PATH'),
+        'wrs_row': image_attributes.get('WRS_ROW'),
+        'cloud_coverage': image_attributes.get('CLOUD_COVER'),
+        'footprint': footprint,
+    }
+
+class SceneCatalog:
+    """
+    In-memory spatial index over the scene footprints found in the data directory.
+
+    Scenes are ordered by scene ID, so positions in the catalog double as a
+    stable sort key for cursor pagination. Per-scene attributes used for
+    filtering are kept as numpy arrays to allow vectorized filters.
+    """
+
+    def __init__(
+        self,
+        scenes: List[Dict],
+        signature: tuple = (),
+        modified_ns: int = 0,
+        content_digest: str = ''
+    ):
+        scenes = sorted(scenes, key=lambda scene: scene['scene_id'])
+        self.scenes = scenes
+        self.signature = signature
+        self.last_modified = datetime.datetime.fromtimestamp(
+            modified_ns / 1e9, tz=datetime.timezone.utc
+        )
+        self.scene_ids = np.array([scene['scene_id'] for scene in scenes], dtype=object)
+        self.acquisition_dates = np.array(
+            [scene['acquisition_date'] or 'NaT' for scene in scenes], dtype='datetime64[D]'
+        )
+        self.cloud_coverage = np.array(
+            [np.nan if scene['cloud_coverage'] is None else scene['cloud_coverage'] for scene in scenes],
+            dtype=float
+        )
+
+        with profile_phase("polygon_build"):
+            self.footprints = np.array(
+                [Polygon(scene['footprint']) for scene in scenes], dtype=object
+            )
+            centroids = shapely.get_coordinates(shapely.centroid(self.footprints))
+            self.centroid_lons = centroids[:, 0]
+            self.centroid_lats = centroids[:, 1]
+            self.tree = shapely.STRtree(self.footprints)
+            self.block_trees = [
+                shapely.STRtree(self.footprints[start:start + INDEX_BLOCK_SIZE])
+                for start in range(0, len(self.footprints), INDEX_BLOCK_SIZE)
+            ]
+
+        # Version of the catalog contents. It only depends on the scene IDs
+        # and file contents (not on modification times), so every server
+        # holding a copy of the same files computes the same generation
+        digest = hashlib.sha1("\n".join(self.scene_ids).encode('utf-8'))
+        digest.update(content_digest.encode('utf-8'))
+        self.generation = digest.hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.scenes)
+
+    def search_page(
+        self,
+        start: int = 0,
+        limit: int = 1000,
+        bbox: Optional[tuple] = None,
+        point: Optional[tuple] = None,
+        radius_km: Optional[float] = None,
+        start_date=None,
+        end_date=None,
+        max_cloud_cover: Optional[float] = None
+    ):
+        """
+        Finds the scenes intersecting `bbox`, or within `radius_km` of the
+        (longitude, latitude) `point`, that pass the filters, in catalog order
+        from position `start`.
+
+        Index blocks are searched in order until more than `limit` scenes are
+        found, so the work done for a page does not grow with the number of
+        earlier pages or with the matches left after it.
+
+        Returns:
+            tuple: Sorted positions of up to `limit + 1` matching scenes, and
+            their distances in kilometers for a radius search (None otherwise).
+        """
+        if point is not None:
+            boxes = _radius_boxes(point[0], point[1], radius_km)
+        else:
+            boxes = [bbox]
+        areas = shapely.box(*np.array(boxes, dtype=float).T)
+
+        found_positions = []
+        found_distances = []
+        found = 0
+        for block in range(start // INDEX_BLOCK_SIZE, len(self.block_trees)):
+            with profile_phase("index_query"):
+                positions = np.unique(self.block_trees[block].query(areas, predicate='intersects')[1])
+                positions = positions + block * INDEX_BLOCK_SIZE
+                positions = positions[positions >= start]
+                positions = positions[self.filter(positions, start_date, end_date, max_cloud_cover)]
+
+            if point is not None:
+                with profile_phase("haversine"):
+                    distances = self.distances_km(point[0], point[1], positions)
+                    within = distances <= radius_km
+                    positions = positions[within]
+                    found_distances.append(distances[within])
+
+            found_positions.append(positions)
+            found += len(positions)
+            if found > limit:
+                break
+
+        positions = np.concatenate(found_positions)[:limit + 1] if found_positions else np.empty(0, dtype=int)
+        distances = None
+        if point is not None:
+            distances = np.concatenate(found_distances)[:limit + 1] if found_distances else np.empty(0)
+        return positions, distances
+
+    def distances_km(self, longitude: float, latitude: float, positions: np.ndarray) -> np.ndarray:
+        """
+        Great-circle distances from the point to the nearest edge of each
+        footprint, zero when the point falls inside it.
+        """
+        if len(positions) == 0:
+            return np.empty(0)
+        lines = shapely.shortest_line(shapely.Point(longitude, latitude), self.footprints[positions])
+        nearest = shapely.get_coordinates(lines)[1::2]
+        return haversine_km(longitude, latitude, nearest[:, 0], nearest[:, 1])
+
+    def filter(
+        self,
+        positions: np.ndarray,
+        start_date=None,
+        end_date=None,
+        max_cloud_cover: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Returns a boolean mask selecting the positions that pass the filters.
+        """
+        mask = np.ones(len(positions), dtype=bool)
+        if start_date is not None:
+            mask &= self.acquisition_dates[positions] >= np.datetime64(start_date, 'D')
+        if end_date is not None:
+            mask &= self.acquisition_dates[positions] <= np.datetime64(end_date, 'D')
+        if max_cloud_cover is not None:
+            mask &= self.cloud_coverage[positions] <= max_cloud_cover
+        return mask
+
+    def closest(self, longitude: float, latitude: float):
+        """
+        Returns the position of the scene whose footprint centroid is closest
+        to the point and the distance in kilometers, or (None, None) when the
+        catalog is empty.
+        """
+        if len(self) == 0:
+            return None, None
+        with profile_phase("haversine"):
+            distances = haversine_km(longitude, latitude, self.centroid_lons, self.centroid_lats)
+            position = int(np.argmin(distances))
+        return position, float(distances[position])
+
+    def read_scene(self, position: int) -> Dict:
+        """
+        Reads the full metadata file of the scene at `position`.
+        """
+        filepath = os.path.join(DATA_DIR, self.scenes[position]['filename'])
+        with profile_phase("json_parse"), open(filepath, 'r') as f:
+            data = json.load(f)
+        return data.get('LANDSAT_METADATA_FILE', data)
+
+    def position_after(self, scene_id: str) -> int:
+        """
+        Returns the first catalog position sorting after `scene_id`.
+        """
+        return int(np.searchsorted(self.scene_ids, scene_id, side='right'))
+
+    def coverage(self, fields: np.ndarray, allowed: Optional[np.ndarray] = None):
+        """
+        Computes how well the scene footprints cover each field polygon.
+
+        All fields are matched against the index in a single query, and the
+        intersections and areas of every (field, scene) pair are computed with
+        vectorized shapely operations.
+
+        Args:
+            fields (np.ndarray): Array of Polygon / MultiPolygon geometries.
+            allowed (np.ndarray): Optional boolean mask over the catalog
+                selecting the scenes that may be used.
+
+        Returns:
+            tuple: Per-field arrays of covered fraction, best scene position
+            (-1 when no scene intersects), best scene fraction and scene count.
+        """
+        covered = np.zeros(len(fields))
+        best_position = np.full(len(fields), -1)
+        best_fraction = np.zeros(len(fields))
+        scene_count = np.zeros(len(fields), dtype=int)
+
+        with profile_phase("index_query"):
+            field_index, positions = self.tree.query(fields, predicate='intersects')
+            if allowed is not None:
+                keep = allowed[positions]
+                field_index, positions = field_index[keep], positions[keep]
+        if len(field_index) == 0:
+            return covered, best_position, best_fraction, scene_count
+
+        with profile_phase("intersection"):
+            field_areas = shapely.area(fields)
+            overlaps = shapely.intersection(fields[field_index], self.footprints[positions])
+            fractions = np.divide(
+                shapely.area(overlaps), field_areas[field_index],
+                out=np.zeros(len(overlaps)), where=field_areas[field_index] > 0
+            )
+
+            # Best scene per field: largest fraction first, then lowest cloud cover
+            cloud = np.nan_to_num(self.cloud_coverage[positions], nan=np.inf)
+            order = np.lexsort((cloud, -fractions, field_index))
+            field_index, positions = field_index[order], positions[order]
+            overlaps, fractions = overlaps[order], fractions[order]
+            hit_fields, first, counts = np.unique(field_index, return_index=True, return_counts=True)
+
+            best_position[hit_fields] = positions[first]
+            best_fraction[hit_fields] = fractions[first]
+            scene_count[hit_fields] = counts
+            covered[hit_fields] = fractions[first]
+
+            # Fields overlapped by several scenes need the union of the overlaps
+            for field, start, count in zip(hit_fields[counts > 1], first[counts > 1], counts[counts > 1]):
+                union = shapely.union_all(overlaps[start:start + count])
+                if field_areas[field] > 0:
+                    covered[field] = shapely.area(union) / field_areas[field]
+
+        return np.minimum(covered, 1.0), best_position, np.minimum(best_fraction, 1.0), scene_count
+
+def _data_signature() -> tuple:
+    """
+    Name, modification time and size of every scene file in the data
+    directory; any added, removed or rewritten file changes it.
+    """
+    with profile_phase("file_scan"):
+        entries = []
+        with os.scandir(DATA_DIR) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+
+def _load_catalog(signature: tuple) -> SceneCatalog:
+    scenes = []
+    seen = set()
+    content = hashlib.sha1()
+
+    for filename, _, _ in signature:
+        filepath = os.path.join(DATA_DIR, filename)
+        with profile_phase("json_parse"):
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+            content.update(filename.encode('utf-8') + b'\0' + raw + b'\0')
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError as json_err:
+                logger.error(f"Error decoding JSON file {filename}: {json_err}")
+                continue
+
+        scene = _scene_summary(filename, data)
+        if scene is None or scene['scene_id'] in seen:
+            continue
+        seen.add(scene['scene_id'])
+        scenes.append(scene)
+
+    # Removing a file only shows in the directory modification time
+    modified_ns = max([os.stat(DATA_DIR).st_mtime_ns] + [mtime for _, mtime, _ in signature])
+    catalog = SceneCatalog(scenes, signature, modified_ns, content.hexdigest())
+    logger.info(f"Loaded scene catalog {catalog.generation} with {len(catalog)} scenes")
+    return catalog
+
+_catalog = None
+_catalog_checked_at = 0.0
+_catalog_lock = threading.Lock()
+
+def get_catalog() -> SceneCatalog:
+    """
+    Returns the scene catalog, rebuilding it when scene files were added,
+    removed or rewritten in the data directory.
+
+    The data directory is scanned at most once every CATALOG_REFRESH_SECONDS,
+    so requests in between only pay for a clock read.
+    """
+    global _catalog, _catalog_checked_at
+
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _catalog_checked_at < CATALOG_REFRESH_SECONDS:
+        return catalog
+
+    with _catalog_lock:
+        # Another thread may have refreshed the catalog while we waited
+        if _catalog is not None and time.monotonic() - _catalog_checked_at < CATALOG_REFRESH_SECONDS:
+            return _catalog
+        signature = _data_signature()
+        if _catalog is None or _catalog.signature != signature:
+            _catalog = _load_catalog(signature)
+        _catalog_checked_at = time.monotonic()
+        return _catalog